@@ -0,0 +1,6 @@
+"""Allow running the package with ``python -m glossary_tool``."""
+
+from .cli import main
+
+if __name__ == "__main__":
+    main()
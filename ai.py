@@ -3,13 +3,15 @@
 from __future__ import annotations
 
 import json
-
-from tqdm import tqdm
+from collections import Counter, deque
 
 from .api import chat_completion, get_message_content
-from .config import BATCH_P1, MODEL_P1_CTX
+from .clustering import merge_cluster_contexts
+from .config import BATCH_P1, BISECT_MAX_RETRIES, BISECT_RETRY_BUDGET, CLUSTER_TAG_RULE, MODEL_P1_CTX
 from .text_processing import extract_json_array_of_objects
 
+_recovery_stats = {"retry_calls": 0, "recovered": 0, "skipped": 0}
+
 
 def get_related_terms(term: str, existing_terms: set[str]) -> list[str]:
     term_tokens = set(term.lower().split())
@@ -21,100 +23,193 @@ def get_related_terms(term: str, existing_terms: set[str]) -> list[str]:
     return related
 
 
-def ai_classify_with_context(all_terms, contexts_cache, existing_terms):
-    tag_map = {}
-    if not all_terms:
-        return tag_map
-
-    for i in tqdm(range(0, len(all_terms), BATCH_P1), desc="AI Step 1: With Context"):
-        batch = all_terms[i:i + BATCH_P1]
-
-        objs = []
-        for t in batch:
+def _build_context_objs(batch, contexts_cache, existing_terms, clusters=None):
+    clusters = clusters or {}
+    objs = []
+    for t in batch:
+        members = clusters.get(t, [])
+        if members:
+            ctx = merge_cluster_contexts(t, members, contexts_cache)
+        else:
             ctx = contexts_cache.get(t, [])
-            related_existing = get_related_terms(t, existing_terms)
-            objs.append(
-                {
-                    "term": t,
-                    "contexts": ctx[:30],
-                    "existing_terms": sorted(related_existing),
-                }
-            )
-
-        prompt = _build_context_prompt(objs)
-        data = chat_completion(
-            [{"role": "system", "content": "Output JSON array only."}, {"role": "user", "content": prompt}],
-            model=MODEL_P1_CTX,
-        )
-        content = get_message_content(data) if data else ""
+        related_existing = get_related_terms(t, existing_terms)
+        obj = {
+            "term": t,
+            "contexts": ctx[:30],
+            "existing_terms": sorted(related_existing),
+        }
+        if members:
+            obj["variants"] = members
+        objs.append(obj)
+    return objs
+
+
+def spread_cluster_tag(tag: str, rule: str = CLUSTER_TAG_RULE) -> str:
+    if rule == "propagate":
+        return tag
+    if rule == "representative_only":
+        return "Remove" if tag == "Keep" else tag
+    raise ValueError(f"Unknown CLUSTER_TAG_RULE: {rule!r}")
+
+
+def estimate_step1_cost(all_terms, contexts_cache, existing_terms, clusters=None):
+    """Return (api_calls, prompt_chars) Step 1 would spend on these terms."""
+    calls, chars = 0, 0
+    for i in range(0, len(all_terms), BATCH_P1):
+        batch = all_terms[i:i + BATCH_P1]
+        objs = _build_context_objs(batch, contexts_cache, existing_terms, clusters)
+        calls += 1
+        chars += len(_build_context_prompt(objs))
+    return calls, chars
+
+
+def _resolve_with_bisection(batch, send):
+    """Tag ``batch`` via ``send``, re-sending only the terms a response left out.
+
+    ``send(sub_batch)`` returns the tags it could parse (``{}`` when the reply
+    was unusable) or None when the request itself failed, in which case the
+    terms are not retried. Missing terms are split in half down to single
+    terms; a term that already went out alone is not sent again. No term is
+    re-sent more than BISECT_MAX_RETRIES times, and retries stop for the rest
+    of the run once BISECT_RETRY_BUDGET calls have been spent.
+    """
+    tags, retries = {}, Counter()
+    pending = deque([list(batch)])
+    is_retry = False
+    while pending:
+        sub = pending.popleft()
+        if is_retry:
+            if _recovery_stats["retry_calls"] >= BISECT_RETRY_BUDGET:
+                _recovery_stats["skipped"] += sum(len(s) for s in [sub, *pending])
+                break
+            _recovery_stats["retry_calls"] += 1
+        got = send(sub)
+        if is_retry:
+            _recovery_stats["recovered"] += len(got or {})
+        is_retry = True
+        if got is None:
+            continue
+        tags.update(got)
+        if len(sub) == 1:
+            continue
+        missing = [t for t in sub if t not in got]
+        for t in missing:
+            retries[t] += 1
+        missing = [t for t in missing if retries[t] <= BISECT_MAX_RETRIES]
+        if len(missing) == 1:
+            pending.append(missing)
+        elif missing:
+            mid = (len(missing) + 1) // 2
+            pending.extend([missing[:mid], missing[mid:]])
+    return tags
+
+
+def recovery_report() -> str:
+    return (
+        f"🩹 Batch recovery: {_recovery_stats['retry_calls']}/{BISECT_RETRY_BUDGET} retry calls used, "
+        f"{_recovery_stats['recovered']} terms recovered, "
+        f"{_recovery_stats['skipped']} terms left untried after the budget ran out."
+    )
+
+
+def _send_classify(batch, contexts_cache, existing_terms, clusters):
+    objs = _build_context_objs(batch, contexts_cache, existing_terms, clusters)
+    prompt = _build_context_prompt(objs)
+    data = chat_completion(
+        [{"role": "system", "content": "Output JSON array only."}, {"role": "user", "content": prompt}],
+        model=MODEL_P1_CTX,
+        kind="classify" if len(batch) > 1 else "classify-single",
+    )
+    if not data:
+        return None
+    content = get_message_content(data)
+
+    try:
+        rows = extract_json_array_of_objects(content)
+    except Exception:
+        return {}
 
+    tag_map = {}
+    for obj in rows:
         try:
-            rows = extract_json_array_of_objects(content)
+            t = str(obj.get("term", "")).strip()
+            tag = str(obj.get("tag", "")).strip()
+            if t in batch and tag in {"Keep", "Remove", "Need Recheck"}:
+                tag_map[t] = tag
+                if tag == "Keep":
+                    existing_terms.add(t)
         except Exception:
-            for t in batch:
-                tag_map[t] = "Need Recheck"
             continue
+    return tag_map
 
-        for obj in rows:
-            try:
-                t = str(obj.get("term", "")).strip()
-                tag = str(obj.get("tag", "")).strip()
-                if t in batch and tag in {"Keep", "Remove", "Need Recheck"}:
-                    tag_map[t] = tag
-                    if tag == "Keep":
-                        existing_terms.add(t)
-            except Exception:
-                continue
-
-        for t in batch:
-            if t not in tag_map:
-                tag_map[t] = "Need Recheck"
+
+def classify_batch(batch, contexts_cache, existing_terms, clusters=None):
+    """Run AI Step 1 on one batch; returns tags for the batch and its cluster members.
+
+    When ``clusters`` maps representatives to their near-duplicate members,
+    ``batch`` holds representatives only; each is sent once with the members
+    as "variants" and its tag is spread per ``CLUSTER_TAG_RULE``.
+    """
+    clusters = clusters or {}
+    tag_map = _resolve_with_bisection(
+        batch, lambda sub: _send_classify(sub, contexts_cache, existing_terms, clusters)
+    )
+
+    for t in batch:
+        if t not in tag_map:
+            tag_map[t] = "Need Recheck"
+        for member in clusters.get(t, []):
+            tag_map[member] = spread_cluster_tag(tag_map[t])
+            if tag_map[member] == "Keep":
+                existing_terms.add(member)
 
     return tag_map
 
 
-def ai_prune_redundant_terms(keep_terms, existing_terms):
-    tag_map = {}
-    if not keep_terms:
-        return tag_map
-
-    for i in tqdm(range(0, len(keep_terms), BATCH_P1), desc="AI Step 2: Prune Redundant"):
-        batch = keep_terms[i:i + BATCH_P1]
-        objs = []
-        for t in batch:
-            related_existing = get_related_terms(t, existing_terms)
-            objs.append({"term": t, "existing_terms": sorted(related_existing)})
-
-        prompt = _build_redundancy_prompt(objs)
-        data = chat_completion(
-            [{"role": "system", "content": "Output JSON array only."}, {"role": "user", "content": prompt}],
-            model=MODEL_P1_CTX,
-        )
-        content = get_message_content(data) if data else ""
+def _send_prune(batch, existing_terms):
+    objs = []
+    for t in batch:
+        related_existing = get_related_terms(t, existing_terms)
+        objs.append({"term": t, "existing_terms": sorted(related_existing)})
+
+    prompt = _build_redundancy_prompt(objs)
+    data = chat_completion(
+        [{"role": "system", "content": "Output JSON array only."}, {"role": "user", "content": prompt}],
+        model=MODEL_P1_CTX,
+        kind="prune" if len(batch) > 1 else "prune-single",
+    )
+    if not data:
+        return None
+    content = get_message_content(data)
 
+    try:
+        rows = extract_json_array_of_objects(content)
+    except Exception:
+        return {}
+
+    tag_map = {}
+    for obj in rows:
         try:
-            rows = extract_json_array_of_objects(content)
+            t = str(obj.get("term", "")).strip()
+            tag = str(obj.get("tag", "")).strip()
+            if t in batch and tag in {"Keep", "Remove"}:
+                tag_map[t] = tag
+                if tag == "Keep":
+                    existing_terms.add(t)
+                elif tag == "Remove" and t in existing_terms:
+                    existing_terms.remove(t)
         except Exception:
-            for t in batch:
-                tag_map[t] = "Keep"
             continue
+    return tag_map
+
+
+def prune_batch(batch, existing_terms):
+    """Run AI Step 2 on one batch of Step 1 Keep terms."""
+    tag_map = _resolve_with_bisection(batch, lambda sub: _send_prune(sub, existing_terms))
 
-        for obj in rows:
-            try:
-                t = str(obj.get("term", "")).strip()
-                tag = str(obj.get("tag", "")).strip()
-                if t in batch and tag in {"Keep", "Remove"}:
-                    tag_map[t] = tag
-                    if tag == "Keep":
-                        existing_terms.add(t)
-                    elif tag == "Remove" and t in existing_terms:
-                        existing_terms.remove(t)
-            except Exception:
-                continue
-
-        for t in batch:
-            if t not in tag_map:
-                tag_map[t] = "Keep"
+    for t in batch:
+        if t not in tag_map:
+            tag_map[t] = "Keep"
 
     return tag_map
 
@@ -130,6 +225,8 @@ Each term must be evaluated **as-is**, based only on:
 
 Do NOT infer meanings, synonyms, or definitions. 
 Only compare tokens exactly; do not match substrings within other words.
+Some terms list "variants": near-duplicate spellings found in the same text.
+Judge such a term on behalf of its variants and return one object for the term only.
 
 Assign each term exactly one tag:
 - Keep: term is complete, meaningful, necessary, and not redundant
@@ -2,17 +2,142 @@
 
 from __future__ import annotations
 
+import queue
+import threading
 import time
+from collections import defaultdict, deque
 
 import requests
 
-from .config import API_KEY, BASE_URL, MODEL, RETRY_DELAY, RETRY_LIMIT, TIMEOUT
+from .config import (
+    API_KEY,
+    BASE_URL,
+    HEDGE_ENABLED,
+    HEDGE_MAX_EXTRA,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
+    HEDGE_WINDOW,
+    MODEL,
+    RETRY_DELAY,
+    RETRY_LIMIT,
+    TIMEOUT,
+)
 
+# Extra wait on top of TIMEOUT before a call whose worker never reported back
+# is treated as timed out.
+_WAIT_SLACK = 10
 
-def safe_request(url, headers, payload, max_retries=RETRY_LIMIT, delay=RETRY_DELAY):
+_lock = threading.Lock()
+# Rolling latencies per (model, kind of call): a batch classification and a
+# single-term retry have very different typical durations.
+_latencies = defaultdict(lambda: deque(maxlen=HEDGE_WINDOW))
+_stats = {"requests": 0, "hedges": 0}
+# (t0, hedge_finished, primary_flight) for every hedge that won.
+_hedge_wins = []
+
+
+def _hedge_delay(window_key) -> float | None:
+    """Latency at HEDGE_PERCENTILE of recent successful requests of this kind, if known."""
+    if not HEDGE_ENABLED:
+        return None
+    with _lock:
+        window = _latencies[window_key]
+        if len(window) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(window)
+    idx = min(len(ordered) - 1, int(len(ordered) * HEDGE_PERCENTILE / 100))
+    return ordered[idx]
+
+
+def _claim_hedge() -> bool:
+    with _lock:
+        if _stats["hedges"] + 1 > HEDGE_MAX_EXTRA * _stats["requests"]:
+            return False
+        _stats["hedges"] += 1
+        return True
+
+
+def _post_into(results, flight, url, headers, payload, t0, window_key):
+    start = time.perf_counter()
+    resp, err = None, None
+    try:
+        resp = requests.post(url, headers=headers, json=payload, timeout=TIMEOUT)
+    except BaseException as e:
+        # Anything raised here must reach the caller, or it would wait forever.
+        err = e
+    try:
+        done = time.perf_counter()
+        with _lock:
+            if resp is not None and resp.status_code == 200:
+                _latencies[window_key].append(done - start)
+            flight["finished"] = done - t0
+            beaten = flight.get("beaten", False)
+        if beaten and resp is not None:
+            resp.close()
+    finally:
+        results.put((flight, resp, err))
+
+
+def _hedged_post(url, headers, payload, kind="chat"):
+    """POST once, sending a duplicate if the call outlives the usual p-latency.
+
+    Whichever response arrives first wins. requests cannot abort a call in
+    flight, so the other one is left to finish in its daemon thread and its
+    response is discarded.
+    """
+    results = queue.Queue()
+    t0 = time.perf_counter()
+    flights = []
+    window_key = (payload.get("model"), kind)
+
+    deadline = t0
+
+    def launch(label):
+        nonlocal deadline
+        flight = {"label": label}
+        flights.append(flight)
+        deadline = time.perf_counter() + TIMEOUT + _WAIT_SLACK
+        threading.Thread(
+            target=_post_into, args=(results, flight, url, headers, payload, t0, window_key), daemon=True
+        ).start()
+
+    with _lock:
+        _stats["requests"] += 1
+    launch("primary")
+    delay = _hedge_delay(window_key)
+    pending, fallback = 1, None
+    while pending:
+        remaining = max(deadline - time.perf_counter(), 0.0)
+        try:
+            flight, resp, err = results.get(timeout=remaining if delay is None else min(delay, remaining))
+        except queue.Empty:
+            if delay is None or time.perf_counter() >= deadline:
+                raise requests.exceptions.Timeout(f"No response within {TIMEOUT + _WAIT_SLACK}s")
+            delay = None
+            if _claim_hedge():
+                launch("hedge")
+                pending += 1
+            continue
+        pending -= 1
+        if err is None and resp.status_code == 200:
+            with _lock:
+                for other in flights:
+                    if other is not flight:
+                        other["beaten"] = True
+                if flight["label"] == "hedge":
+                    _hedge_wins.append((t0, flight["finished"], flights[0]))
+            return resp
+        fallback = (resp, err)
+    resp, err = fallback
+    if err is not None:
+        raise err
+    return resp
+
+
+def safe_request(url, headers, payload, max_retries=RETRY_LIMIT, delay=RETRY_DELAY, kind="chat"):
     for attempt in range(1, max_retries + 1):
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=TIMEOUT)
+            resp = _hedged_post(url, headers, payload, kind)
             if resp.status_code != 200:
                 print(f"⚠️ API error (status {resp.status_code}) on attempt {attempt}: {resp.text[:200]}")
                 time.sleep(delay)
@@ -29,11 +154,11 @@ def safe_request(url, headers, payload, max_retries=RETRY_LIMIT, delay=RETRY_DEL
     return None
 
 
-def chat_completion(messages, model=None):
+def chat_completion(messages, model=None, kind="chat"):
     url = f"{BASE_URL}/chat/completions"
     headers = {"Authorization": f"Bearer {API_KEY}", "Content-Type": "application/json"}
     payload = {"model": (model or MODEL), "messages": messages}
-    return safe_request(url, headers, payload)
+    return safe_request(url, headers, payload, kind=kind)
 
 
 def get_message_content(api_json) -> str:
@@ -48,3 +173,23 @@ def get_message_content(api_json) -> str:
         pass
     return ""
 
+
+def request_report() -> str:
+    """Summarize hedging. Latency saved counts only hedge wins whose primary
+    was still running at that point; primaries still in flight count up to now."""
+    now = time.perf_counter()
+    saved, in_flight = 0.0, 0
+    with _lock:
+        stats = dict(_stats)
+        wins = list(_hedge_wins)
+        for t0, won_at, primary in wins:
+            finished = primary.get("finished")
+            if finished is None:
+                in_flight += 1
+                saved += now - t0 - won_at
+            elif finished > won_at:
+                saved += finished - won_at
+    return (
+        f"📡 API: {stats['requests']} requests, {stats['hedges']} hedges fired "
+        f"({len(wins)} won, {in_flight} primaries still in flight), ~{saved:.1f}s latency saved."
+    )
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Startup benchmark for the cheap CLI paths.
+
+Runs each command in a fresh interpreter, checks that it behaved as expected,
+reports the median wall time and exits non-zero when any of them fails or
+goes over the budget:
+
+    python bench_startup.py [--budget-ms 100] [--runs 7]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PACKAGE_DIR = Path(__file__).absolute().parent
+# (args, expected exit code or None for any, stream, text it must contain).
+# check-config exits 1 without credentials, so only its output is checked.
+COMMANDS = [
+    ([], 1, "stderr", "Usage:"),
+    (["check-config"], None, "stdout", "BASE_URL:"),
+    (["stats"], 0, "stdout", ""),
+]
+
+
+def check_result(proc: subprocess.CompletedProcess, code: int | None, stream: str, marker: str) -> str | None:
+    """Return why the command misbehaved, or None when it did what it should."""
+    if code is not None and proc.returncode != code:
+        return f"exit code {proc.returncode}, expected {code}"
+    if marker not in getattr(proc, stream):
+        return f"{marker!r} missing from {stream}"
+    return None
+
+
+def time_command(args: list[str], runs: int, code: int | None, stream: str, marker: str) -> tuple[float, str | None]:
+    cmd = [sys.executable, "-m", PACKAGE_DIR.name, *args]
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(cmd, cwd=PACKAGE_DIR.parent, capture_output=True, text=True)
+        samples.append((time.perf_counter() - start) * 1000)
+        error = check_result(proc, code, stream, marker)
+        if error:
+            return statistics.median(samples), error
+    return statistics.median(samples), None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    parser.add_argument("--runs", type=int, default=7)
+    opts = parser.parse_args(argv)
+
+    over, failed = [], []
+    for args, code, stream, marker in COMMANDS:
+        label = " ".join(args) or "(usage)"
+        ms, error = time_command(args, opts.runs, code, stream, marker)
+        if error:
+            status = f"FAILED ({error})"
+            failed.append(label)
+        elif ms > opts.budget_ms:
+            status = "OVER BUDGET"
+            over.append(label)
+        else:
+            status = "ok"
+        print(f"{label:<16} {ms:7.1f} ms  {status}")
+
+    if failed:
+        print(f"❌ Command(s) failed, timings not trusted: {', '.join(failed)}")
+    if over:
+        print(f"❌ Startup budget of {opts.budget_ms:.0f} ms exceeded by: {', '.join(over)}")
+    if failed or over:
+        return 1
+    print(f"✅ All cheap commands within {opts.budget_ms:.0f} ms.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""Local pre-classifier trained on past Phase 3 Step 1 decisions.
+
+A small logistic regression over features the pipeline already computes. It
+runs on the CPU with the standard library only, so it can tag confident
+candidates before any API call is made.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import random
+
+from .config import BATCH_P1, CLASSIFIER_MODEL, CLASSIFIER_THRESHOLD, DECISIONS_LOG
+
+FEATURE_NAMES = [
+    "log_freq",
+    "n_tokens",
+    "n_chars",
+    "cap_ratio",
+    "all_upper",
+    "has_digit",
+    "ctx_lines",
+    "ctx_avg_chars",
+]
+
+
+def decision_record(term: str, freq, context, tag: str) -> dict:
+    ctx = context if isinstance(context, str) else ""
+    lines = [c for c in ctx.split(" || ") if c.strip()]
+    return {
+        "term": str(term),
+        "freq": int(freq),
+        "ctx_lines": len(lines),
+        "ctx_chars": sum(len(c) for c in lines),
+        "tag": tag,
+    }
+
+
+def term_features(rec: dict) -> list[float]:
+    term = str(rec.get("term", ""))
+    toks = term.split()
+    n_tok = max(len(toks), 1)
+    ctx_lines = int(rec.get("ctx_lines", 0))
+    return [
+        math.log1p(max(int(rec.get("freq", 0)), 0)),
+        float(len(toks)),
+        len(term) / 10.0,
+        sum(1 for t in toks if t[:1].isupper()) / n_tok,
+        1.0 if term.isupper() else 0.0,
+        1.0 if any(ch.isdigit() for ch in term) else 0.0,
+        math.log1p(ctx_lines),
+        (int(rec.get("ctx_chars", 0)) / ctx_lines / 100.0) if ctx_lines else 0.0,
+    ]
+
+
+def append_decisions(records: list[dict], path: str = DECISIONS_LOG) -> None:
+    if not records:
+        return
+    with open(path, "a", encoding="utf-8") as fh:
+        for rec in records:
+            fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+
+def load_decisions(path: str = DECISIONS_LOG) -> list[dict]:
+    """Load logged Keep/Remove decisions, keeping the latest one per term."""
+    latest = {}
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if rec.get("tag") in {"Keep", "Remove"}:
+                latest[rec.get("term")] = rec
+    return list(latest.values())
+
+
+class PreClassifier:
+    def __init__(self, weights, bias, mean, std):
+        self.weights = list(weights)
+        self.bias = float(bias)
+        self.mean = list(mean)
+        self.std = list(std)
+
+    def _scale(self, x):
+        return [(v - m) / s for v, m, s in zip(x, self.mean, self.std)]
+
+    def predict_keep(self, rec: dict) -> float:
+        x = self._scale(term_features(rec))
+        z = self.bias + sum(w * v for w, v in zip(self.weights, x))
+        return 1.0 / (1.0 + math.exp(-max(min(z, 35.0), -35.0)))
+
+    def decide(self, rec: dict, threshold: float = CLASSIFIER_THRESHOLD) -> str | None:
+        """Return "Keep"/"Remove" when confident enough, otherwise None."""
+        p = self.predict_keep(rec)
+        if p >= threshold:
+            return "Keep"
+        if p <= 1.0 - threshold:
+            return "Remove"
+        return None
+
+    def save(self, path: str = CLASSIFIER_MODEL) -> None:
+        payload = {
+            "features": FEATURE_NAMES,
+            "weights": self.weights,
+            "bias": self.bias,
+            "mean": self.mean,
+            "std": self.std,
+        }
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, indent=2)
+
+    @classmethod
+    def load(cls, path: str = CLASSIFIER_MODEL) -> PreClassifier | None:
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as fh:
+            payload = json.load(fh)
+        if payload.get("features") != FEATURE_NAMES:
+            print(f"⚠️ Ignoring {path}: trained on a different feature set. Retrain it.")
+            return None
+        return cls(payload["weights"], payload["bias"], payload["mean"], payload["std"])
+
+    @classmethod
+    def fit(cls, records: list[dict], epochs: int = 300, lr: float = 0.5, l2: float = 1e-3) -> PreClassifier:
+        xs = [term_features(r) for r in records]
+        ys = [1.0 if r["tag"] == "Keep" else 0.0 for r in records]
+        n_feat = len(FEATURE_NAMES)
+        mean = [sum(x[j] for x in xs) / len(xs) for j in range(n_feat)]
+        std = []
+        for j in range(n_feat):
+            var = sum((x[j] - mean[j]) ** 2 for x in xs) / len(xs)
+            std.append(math.sqrt(var) or 1.0)
+        model = cls([0.0] * n_feat, 0.0, mean, std)
+        scaled = [model._scale(x) for x in xs]
+
+        for _ in range(epochs):
+            grad_w = [0.0] * n_feat
+            grad_b = 0.0
+            for x, y in zip(scaled, ys):
+                z = model.bias + sum(w * v for w, v in zip(model.weights, x))
+                err = 1.0 / (1.0 + math.exp(-max(min(z, 35.0), -35.0))) - y
+                grad_b += err
+                for j in range(n_feat):
+                    grad_w[j] += err * x[j]
+            model.bias -= lr * grad_b / len(xs)
+            model.weights = [
+                w - lr * (g / len(xs) + l2 * w) for w, g in zip(model.weights, grad_w)
+            ]
+        return model
+
+
+def evaluate(model: PreClassifier, records: list[dict], threshold: float = CLASSIFIER_THRESHOLD) -> dict:
+    decided, correct = 0, 0
+    for rec in records:
+        tag = model.decide(rec, threshold)
+        if tag is None:
+            continue
+        decided += 1
+        correct += tag == rec["tag"]
+    total = len(records)
+    calls_before = math.ceil(total / BATCH_P1)
+    calls_after = math.ceil((total - decided) / BATCH_P1)
+    return {
+        "samples": total,
+        "decided_locally": decided,
+        "coverage": decided / total if total else 0.0,
+        "local_accuracy": correct / decided if decided else 0.0,
+        "api_calls_avoided": calls_before - calls_after,
+    }
+
+
+def _split(records: list[dict], holdout: float = 0.2, seed: int = 13):
+    """Split per term, so a term stays on the same side as the log grows."""
+    train, held = [], []
+    for rec in records:
+        (held if random.Random(f"{seed}:{rec['term']}").random() < holdout else train).append(rec)
+    return train, held
+
+
+def _print_metrics(label: str, metrics: dict) -> None:
+    print(
+        f"📊 {label}: {metrics['decided_locally']}/{metrics['samples']} decided locally "
+        f"({metrics['coverage']:.0%} coverage, {metrics['local_accuracy']:.1%} accurate), "
+        f"~{metrics['api_calls_avoided']} Step 1 API calls avoided."
+    )
+
+
+def train_command(log_path: str = DECISIONS_LOG, model_path: str = CLASSIFIER_MODEL) -> PreClassifier:
+    train, holdout = _split(load_decisions(log_path))
+    if len({r["tag"] for r in train}) < 2:
+        raise RuntimeError(f"Need both Keep and Remove decisions in {log_path} to train.")
+    model = PreClassifier.fit(train)
+    model.save(model_path)
+    print(f"✅ Trained pre-classifier on {len(train)} decisions. Wrote {model_path}")
+    if holdout:
+        _print_metrics("Holdout", evaluate(model, holdout))
+    return model
+
+
+def evaluate_command(log_path: str = DECISIONS_LOG, model_path: str = CLASSIFIER_MODEL) -> dict:
+    model = PreClassifier.load(model_path)
+    if model is None:
+        raise RuntimeError(f"No usable pre-classifier at {model_path}. Run train-classifier first.")
+    _, holdout = _split(load_decisions(log_path))
+    metrics = evaluate(model, holdout)
+    _print_metrics("Holdout", metrics)
+    return metrics
+
+
+def stats_command(log_path: str = DECISIONS_LOG, model_path: str = CLASSIFIER_MODEL) -> dict:
+    records = load_decisions(log_path)
+    n_keep = sum(1 for r in records if r["tag"] == "Keep")
+    stats = {
+        "decisions": len(records),
+        "keep": n_keep,
+        "remove": len(records) - n_keep,
+        "model": os.path.exists(model_path),
+    }
+    print(f"{log_path}: {stats['decisions']} terms (Keep {stats['keep']}, Remove {stats['remove']})")
+    print(f"{model_path}: {'present' if stats['model'] else 'not trained'}")
+    return stats
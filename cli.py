@@ -5,20 +5,107 @@ from __future__ import annotations
 import sys
 
 from .config import OUTPUT_PHASE3, require_api_credentials
-from .phase1 import run_phase1
-from .phase2 import run_phase2
-from .phase3 import run_phase3
+from .shards import PARTIAL_SUFFIX
+
+# Keep this module cheap to import: the phases pull in pandas, inflect, tqdm
+# and requests, so they are imported only once a full run is requested.
+
+USAGE = (
+    "Usage: python glossary.py input.csv\n"
+    "       python glossary.py map shard.csv out.partial.json [--shard N]\n"
+    "       python glossary.py merge merged.partial.json a.partial.json b.partial.json ...\n"
+    "       python glossary.py merged.partial.json\n"
+    "       python glossary.py check-config\n"
+    "       python glossary.py stats\n"
+    "       python glossary.py train-classifier\n"
+    "       python glossary.py evaluate-classifier"
+)
+
+
+def check_config() -> None:
+    from . import config
+
+    print(f"BASE_URL: {config.BASE_URL or '(missing)'}")
+    print(f"API_KEY: {'set' if config.API_KEY else '(missing)'}")
+    print(f"MODEL: {config.MODEL} (step models: {config.MODEL_P1_CTX}, {config.MODEL_P2_NOCTX})")
+    print(f"MIN_FREQ={config.MIN_FREQ} NGRAM_MAX={config.NGRAM_MAX} BATCH_P1={config.BATCH_P1} TIMEOUT={config.TIMEOUT}")
+    try:
+        require_api_credentials()
+    except RuntimeError as e:
+        raise SystemExit(f"❌ {e}")
+    print("✅ Config OK.")
+
+
+def map_command(args: list[str]) -> None:
+    from .shards import map_shard, save_partial
+
+    shard = 0
+    if "--shard" in args:
+        i = args.index("--shard")
+        shard = int(args[i + 1])
+        args = args[:i] + args[i + 2:]
+    if len(args) != 2:
+        raise SystemExit(USAGE)
+    input_file, out_path = args
+    partial = map_shard(input_file, shard)
+    save_partial(partial, out_path)
+    print(f"🗺️ Mapped shard {shard}: {len(partial['terms'])} terms from {input_file}. Wrote {out_path}")
+
+
+def merge_command(args: list[str]) -> None:
+    from functools import reduce
+
+    from .config import OUTPUT_PHASE1
+    from .shards import load_partial, merge_partials, phase1_from_partial, save_partial
+
+    if len(args) < 2:
+        raise SystemExit(USAGE)
+    out_path, inputs = args[0], args[1:]
+    merged = reduce(merge_partials, (load_partial(p) for p in inputs))
+    save_partial(merged, out_path)
+    df_out, _ = phase1_from_partial(merged)
+    df_out.to_csv(OUTPUT_PHASE1, index=False, encoding="utf-8-sig")
+    print(
+        f"🧮 Merged {len(inputs)} partial(s) covering {len(merged['shards'])} shard(s). "
+        f"Wrote {out_path} and {OUTPUT_PHASE1} ({len(df_out)} rows)."
+    )
 
 
 def main(argv: list[str] | None = None):
     args = argv if argv is not None else sys.argv[1:]
     if not args:
-        raise SystemExit("Usage: python glossary.py input.csv")
+        raise SystemExit(USAGE)
+
+    command = args[0]
+    if command == "check-config":
+        check_config()
+        return
+    if command == "map":
+        map_command(args[1:])
+        return
+    if command == "merge":
+        merge_command(args[1:])
+        return
+    if command in {"stats", "train-classifier", "evaluate-classifier"}:
+        from .classifier import evaluate_command, stats_command, train_command
+
+        {"stats": stats_command, "train-classifier": train_command, "evaluate-classifier": evaluate_command}[command]()
+        return
 
     require_api_credentials()
 
+    from .phase1 import run_phase1
+    from .phase2 import run_phase2
+    from .phase3 import run_phase3
+
     input_file = args[0]
-    df_out, texts = run_phase1(input_file)
+    if input_file.endswith(PARTIAL_SUFFIX):
+        from .shards import load_partial, phase1_from_partial
+
+        print(f"🧩 Loading Phase 1 from {input_file} ...")
+        df_out, texts = phase1_from_partial(load_partial(input_file))
+    else:
+        df_out, texts = run_phase1(input_file)
     df_norm = run_phase2(df_out, texts)
     run_phase3(df_norm, texts)
     print(f"🏁 All done! Output: {OUTPUT_PHASE3}")
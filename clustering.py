@@ -0,0 +1,57 @@
+"""Near-duplicate candidate clustering ahead of the Phase 3 AI step."""
+
+from __future__ import annotations
+
+from .config import CLUSTER_MAX_SIZE
+from .phase2 import normalize_key
+
+
+def compact_key(term: str) -> str:
+    """Phase 2 normalized form with spaces and hyphens removed.
+
+    Only spacing and hyphenation variants share it ("Dragon-slayer Sword" /
+    "Dragonslayer Sword"); names that differ by even one letter ("Captain
+    Marlow" / "Captain Marlowe") or by word order do not.
+    """
+    return normalize_key(term).replace(" ", "").replace("-", "")
+
+
+def cluster_terms(
+    terms: list[str],
+    freq_map: dict[str, int] | None = None,
+    max_size: int = CLUSTER_MAX_SIZE,
+) -> dict[str, list[str]]:
+    """Group terms that are spacing or hyphenation variants of each other.
+
+    Returns an ordered mapping of representative -> other members, in order of
+    each cluster's first term. Terms without a variant come back as singleton
+    clusters, so the model still judges every distinct entry on its own.
+    """
+    freq_map = freq_map or {}
+    groups, open_group = [], {}
+    for t in dict.fromkeys(terms):
+        key = compact_key(t)
+        group = open_group.get(key)
+        if group is not None and len(group) < max_size:
+            group.append(t)
+            continue
+        groups.append([t])
+        if key:
+            open_group[key] = groups[-1]
+
+    clusters = {}
+    for members in groups:
+        rep = min(members, key=lambda t: (-int(freq_map.get(t, 0)), len(t), members.index(t)))
+        clusters[rep] = [t for t in members if t != rep]
+    return clusters
+
+
+def merge_cluster_contexts(rep: str, members: list[str], contexts_cache: dict, cap: int = 30) -> list[str]:
+    per_term = [contexts_cache.get(t, []) for t in [rep, *members]]
+    merged, seen = [], set()
+    for pos in range(max((len(c) for c in per_term), default=0)):
+        for ctxs in per_term:
+            if pos < len(ctxs) and ctxs[pos] not in seen:
+                seen.add(ctxs[pos])
+                merged.append(ctxs[pos])
+    return merged[:cap]
@@ -2,23 +2,27 @@
 
 from __future__ import annotations
 
+import math
 import os
 
-from dotenv import load_dotenv
+# BASE_URL, API_KEY and MODEL come from the environment / .env. They are
+# resolved on first access (see __getattr__) so cheap subcommands never pay
+# for loading dotenv.
+_ENV_DEFAULTS = {"BASE_URL": "", "API_KEY": "", "MODEL": "gpt-4o-mini"}
+_env_loaded = False
 
-load_dotenv()
-
-BASE_URL = os.getenv("BASE_URL", "").strip()
-API_KEY = os.getenv("API_KEY", "").strip()
-MODEL = os.getenv("MODEL", "gpt-4o-mini").strip()
 MODEL_P1_CTX = "gpt-4o-mini"
 MODEL_P2_NOCTX = "gpt-5"
 
 MIN_FREQ = 2
 NGRAM_MAX = 4
+# Let Phase 1 skip n-grams that can never pass the Phase 2 capital filter.
+# The final output is unchanged; check with `python diff_pushdown.py input.csv`.
+PUSHDOWN_PHASE2_FILTERS = True
 OUTPUT_PHASE1 = "Glossary_Phase1.csv"
 OUTPUT_PHASE2 = "Glossary_Normalized.csv"
 OUTPUT_PHASE3 = "Glossary_Final.csv"
+OUTPUT_PHASE3_JSONL = None  # e.g. "Glossary_Final.jsonl" to also stream JSON Lines
 CAPITAL_PRESENCE_REQUIRED = True
 BATCH = 20
 BATCH_P1 = 20
@@ -26,10 +30,50 @@ BATCH_P2 = 80
 TIMEOUT = 180
 RETRY_LIMIT = 3
 RETRY_DELAY = 3
+# Re-sends per term when a batch reply is unusable or incomplete: enough to
+# halve a batch down to a single term once.
+BISECT_MAX_RETRIES = math.ceil(math.log2(BATCH_P1)) + 1
+BISECT_RETRY_BUDGET = 100  # retry calls allowed per run across Steps 1 and 2
+HEDGE_ENABLED = True
+HEDGE_PERCENTILE = 95
+HEDGE_WINDOW = 200
+HEDGE_MIN_SAMPLES = 10
+HEDGE_MAX_EXTRA = 0.1  # hedges allowed per request sent, caps the extra spend
+# Off by default: Phase 2 already merges plural/possessive forms, so only
+# spacing/hyphenation variants are left to cluster and there is no benchmark
+# corpus to check recall on.
+CLUSTER_CANDIDATES = False
+CLUSTER_MAX_SIZE = 8
+# How a representative's tag spreads to the rest of its cluster:
+#   "propagate"           -> every member takes the representative's tag
+#   "representative_only" -> members are Removed when the representative is Kept
+CLUSTER_TAG_RULE = "propagate"
+DECISIONS_LOG = "Glossary_Decisions.jsonl"
+CLASSIFIER_MODEL = "Glossary_Classifier.json"
+CLASSIFIER_THRESHOLD = 0.95
+
+
+def load_env() -> None:
+    global _env_loaded
+    if _env_loaded:
+        return
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    _env_loaded = True
+
+
+def __getattr__(name: str):
+    if name in _ENV_DEFAULTS:
+        load_env()
+        value = os.getenv(name, _ENV_DEFAULTS[name]).strip()
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def require_api_credentials() -> None:
     """Ensure BASE_URL and API_KEY are available before hitting the API."""
-    if not BASE_URL or not API_KEY:
+    if not __getattr__("BASE_URL") or not __getattr__("API_KEY"):
         raise RuntimeError("Missing BASE_URL or API_KEY in .env")
 
@@ -0,0 +1,65 @@
+"""Incremental writer for the final glossary."""
+
+from __future__ import annotations
+
+import json
+import os
+
+import pandas as pd
+
+OUTPUT_COLUMNS = ["term", "freq", "context"]
+IN_PROGRESS_SUFFIX = ".partial"
+
+
+def _jsonl(df: pd.DataFrame) -> str:
+    lines = []
+    for rec in df.astype(object).where(df.notna(), None).to_dict(orient="records"):
+        lines.append(json.dumps(rec, ensure_ascii=False) + "\n")
+    return "".join(lines)
+
+
+class StreamingGlossaryWriter:
+    """Append final rows to CSV (and optionally JSONL) as soon as they are known.
+
+    Rows land in arrival order in ``<path>.partial`` while the run is in
+    progress, so translators can start on it and a crash keeps everything
+    written so far without touching the last complete glossary. ``finalize``
+    rewrites the files in canonical order and moves them over the real paths.
+    """
+
+    def __init__(self, csv_path: str, jsonl_path: str | None = None):
+        self.csv_path = csv_path
+        self.jsonl_path = jsonl_path
+        self.csv_partial = f"{csv_path}{IN_PROGRESS_SUFFIX}"
+        self.jsonl_partial = f"{jsonl_path}{IN_PROGRESS_SUFFIX}" if jsonl_path else None
+        self.rows_written = 0
+        self._csv = open(self.csv_partial, "w", encoding="utf-8-sig", newline="")
+        self._jsonl = open(self.jsonl_partial, "w", encoding="utf-8", newline="") if jsonl_path else None
+        pd.DataFrame(columns=OUTPUT_COLUMNS).to_csv(self._csv, index=False)
+        self._csv.flush()
+
+    def write(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        df = df[OUTPUT_COLUMNS]
+        df.to_csv(self._csv, index=False, header=False)
+        self._csv.flush()
+        if self._jsonl:
+            self._jsonl.write(_jsonl(df))
+            self._jsonl.flush()
+        self.rows_written += len(df)
+
+    def close(self) -> None:
+        self._csv.close()
+        if self._jsonl:
+            self._jsonl.close()
+
+    def finalize(self, df_final: pd.DataFrame) -> None:
+        self.close()
+        df_final = df_final[OUTPUT_COLUMNS]
+        df_final.to_csv(self.csv_partial, index=False, encoding="utf-8-sig")
+        os.replace(self.csv_partial, self.csv_path)
+        if self.jsonl_path:
+            with open(self.jsonl_partial, "w", encoding="utf-8", newline="") as fh:
+                fh.write(_jsonl(df_final))
+            os.replace(self.jsonl_partial, self.jsonl_path)
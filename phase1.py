@@ -2,11 +2,9 @@
 
 from __future__ import annotations
 
-from collections import Counter, defaultdict
-
 import pandas as pd
 
-from .config import NGRAM_MAX
+from .config import NGRAM_MAX, PUSHDOWN_PHASE2_FILTERS
 from .text_processing import clean_text, generate_ngrams_from_segment, looks_like_title_variant, tokenize_to_segments
 
 
@@ -19,43 +17,127 @@ def _detect_text_column(df: pd.DataFrame) -> str | None:
     return None
 
 
-def run_phase1(input_file: str):
-    print("🧩 Running Phase 1: extraction ...")
+def read_texts(input_file: str) -> list[str]:
     df = pd.read_csv(input_file)
     text_col = _detect_text_column(df)
     if not text_col:
         raise RuntimeError("Could not find text column in input CSV.")
-
-    texts = df[text_col].dropna().astype(str).tolist()
-    freq = Counter()
-    variants = defaultdict(list)
-    first_seen = {}
-    first_pos = {}
-
-    for row_idx, text in enumerate(texts):
-        cleaned = clean_text(text)
-        for seg_tokens in tokenize_to_segments(cleaned):
+    return df[text_col].dropna().astype(str).tolist()
+
+
+def tokenize_rows(texts: list[str]) -> list[list[list[str]]]:
+    return [tokenize_to_segments(clean_text(text)) for text in texts]
+
+
+def token_forms(segment_rows: list[list[list[str]]]) -> dict[str, set[str]]:
+    """Map each lowercased token to the surface forms it appears as."""
+    forms = {}
+    for segments in segment_rows:
+        for seg_tokens in segments:
+            for tok in seg_tokens:
+                forms.setdefault(tok.lower(), set()).add(tok)
+    return forms
+
+
+def passable_first_tokens(forms: dict[str, set[str]]) -> set[str]:
+    """Lowercased first tokens whose n-grams can survive Phase 2's capital filter.
+
+    Phase 2 keeps a term only if its first token starts with a capital letter,
+    after picking one representative per ``normalize_key`` group. A key may
+    therefore be dropped early only if no key in its group can pass: none of
+    the surface forms of its first token may normalize to the same first word
+    as a capitalized token seen anywhere in the corpus. Surface forms are
+    checked one by one because ``normalize_key`` is not case-insensitive
+    (e.g. "Crises" vs "crises").
+
+    ``forms`` comes from ``token_forms``; unions of per-shard maps are exact.
+    """
+    from .phase2 import normalize_key
+
+    def first_word(tok):
+        norm = normalize_key(tok)
+        return norm.split()[0] if norm else ""
+
+    first_words = {}
+    capitalized = set()
+    for variants in forms.values():
+        for tok in variants:
+            first_words[tok] = first_word(tok)
+            if tok[0].isalpha() and tok[0].isupper():
+                capitalized.add(first_words[tok])
+
+    return {
+        low for low, variants in forms.items()
+        if any(first_words[tok] in capitalized for tok in variants)
+    }
+
+
+def count_terms(
+    texts: list[str],
+    shard: int = 0,
+    segment_rows: list[list[list[str]]] | None = None,
+    first_tokens: set[str] | None = None,
+) -> dict:
+    """Count n-gram terms over ``texts``.
+
+    Returns ``{key: [freq, first_variant, first_pos, title_variant, title_pos]}``
+    where positions are ``(shard, row_idx, seq)`` tuples. Everything needed to
+    pick the display form and the order survives an associative merge: the
+    earliest position wins and frequencies add up.
+
+    When ``first_tokens`` is given, n-grams whose lowercased first token is not
+    in it are skipped (see ``passable_first_tokens``).
+    """
+    if segment_rows is None:
+        segment_rows = tokenize_rows(texts)
+    counts = {}
+    seq = 0
+    for row_idx, segments in enumerate(segment_rows):
+        for seg_tokens in segments:
             for ngram_tokens in generate_ngrams_from_segment(seg_tokens, max_n=NGRAM_MAX):
                 filtered = [t for t in ngram_tokens if not re_fullmatch_digits(t)]
                 if not filtered:
                     continue
                 if len(filtered) == 1 and is_single_char(filtered[0]):
                     continue
+                if first_tokens is not None and filtered[0].lower() not in first_tokens:
+                    continue
                 key = " ".join([t.lower() for t in filtered])
-                freq[key] += 1
                 variant = " ".join(filtered)
-                if not variants[key] or variants[key][-1] != variant:
-                    variants[key].append(variant)
-                first_seen.setdefault(key, variant)
-                first_pos.setdefault(key, row_idx)
-
+                pos = (shard, row_idx, seq)
+                seq += 1
+                entry = counts.get(key)
+                if entry is None:
+                    entry = counts[key] = [0, variant, pos, None, None]
+                entry[0] += 1
+                if entry[3] is None and looks_like_title_variant(variant):
+                    entry[3], entry[4] = variant, pos
+    return counts
+
+
+def build_phase1_table(
+    counts: dict,
+    row_offsets: dict[int, int] | None = None,
+    first_tokens: set[str] | None = None,
+) -> pd.DataFrame:
+    row_offsets = row_offsets or {}
     rows = []
-    for key, count in freq.items():
-        seen = variants[key]
-        disp = next((v for v in seen if looks_like_title_variant(v)), None) or first_seen.get(key, seen[0])
-        rows.append({"term": disp, "freq": count, "order": first_pos.get(key, 10**12)})
+    for key, (count, first_variant, first_pos, title_variant, _) in counts.items():
+        if first_tokens is not None and key.split(" ", 1)[0] not in first_tokens:
+            continue
+        disp = title_variant or first_variant
+        order = row_offsets.get(first_pos[0], 0) + first_pos[1]
+        rows.append({"term": disp, "freq": count, "order": order})
+
+    return pd.DataFrame(rows).sort_values(by=["order", "term"], ascending=[True, True]).reset_index(drop=True)
 
-    df_out = pd.DataFrame(rows).sort_values(by=["order", "term"], ascending=[True, True]).reset_index(drop=True)
+
+def run_phase1(input_file: str, pushdown: bool = PUSHDOWN_PHASE2_FILTERS):
+    print("🧩 Running Phase 1: extraction ...")
+    texts = read_texts(input_file)
+    segment_rows = tokenize_rows(texts)
+    first_tokens = passable_first_tokens(token_forms(segment_rows)) if pushdown else None
+    df_out = build_phase1_table(count_terms(texts, segment_rows=segment_rows, first_tokens=first_tokens))
     return df_out, texts
 
 
@@ -2,10 +2,17 @@
 
 from __future__ import annotations
 
+import math
+
 import pandas as pd
+from tqdm import tqdm
 
-from .ai import ai_classify_with_context, ai_prune_redundant_terms
-from .config import OUTPUT_PHASE3
+from .ai import classify_batch, estimate_step1_cost, prune_batch, recovery_report
+from .api import request_report
+from .classifier import PreClassifier, append_decisions, decision_record
+from .clustering import cluster_terms
+from .config import BATCH_P1, CLUSTER_CANDIDATES, OUTPUT_PHASE3, OUTPUT_PHASE3_JSONL
+from .output import OUTPUT_COLUMNS, StreamingGlossaryWriter
 from .text_processing import split_segments_strict
 
 
@@ -15,38 +22,104 @@ def run_phase3(df_norm: pd.DataFrame, texts):
     df_locked = df_norm[df_norm.get("must_keep", False) == True].copy()
     df_candidates = df_norm[df_norm.get("must_keep", False) == False].copy()
 
-    if df_candidates.empty:
-        df_final = df_locked.copy()
-        df_final = df_final[["term", "freq", "context"]]
-        df_final.to_csv(OUTPUT_PHASE3, index=False, encoding="utf-8-sig")
-        print(f"✅ Phase 3 skipped (all must_keep). Wrote {len(df_final)} rows.")
-        return df_final
+    writer = StreamingGlossaryWriter(OUTPUT_PHASE3, OUTPUT_PHASE3_JSONL)
+    try:
+        writer.write(df_locked)
+        print(f"📝 Streaming rows to {writer.csv_partial}: {writer.rows_written} must_keep rows written.")
 
-    all_terms = list(df_candidates["term"].astype(str))
-    contexts_cache = {
-        row.term: split_segments_strict(row.context)[:30] if isinstance(row.context, str) else []
-        for _, row in df_candidates.iterrows()
-    }
+        if df_candidates.empty:
+            df_final = df_locked.copy()
+            df_final = df_final[OUTPUT_COLUMNS]
+            writer.finalize(df_final)
+            print(f"✅ Phase 3 skipped (all must_keep). Wrote {len(df_final)} rows.")
+            return df_final
 
-    existing_terms = set(df_locked["term"].astype(str))
-    tag_map_step1 = ai_classify_with_context(all_terms, contexts_cache, existing_terms)
+        all_terms = list(df_candidates["term"].astype(str))
+        contexts_cache = {
+            row.term: split_segments_strict(row.context)[:30] if isinstance(row.context, str) else []
+            for _, row in df_candidates.iterrows()
+        }
 
-    keep_terms = [t for t, tag in tag_map_step1.items() if tag == "Keep"]
-    tag_map_step2 = ai_prune_redundant_terms(keep_terms, existing_terms)
+        existing_terms = set(df_locked["term"].astype(str))
+        records = {
+            str(row.term): decision_record(row.term, row.freq, row.context, "")
+            for row in df_candidates.itertuples(index=False)
+        }
 
-    final_tag_map = {}
-    for t in all_terms:
-        tag = tag_map_step2.get(t, tag_map_step1.get(t, "Need Recheck"))
-        final_tag_map[t] = tag
+        local_tags = _pre_classify(all_terms, records)
+        for t, tag in local_tags.items():
+            if tag == "Keep":
+                existing_terms.add(t)
+        api_terms = [t for t in all_terms if t not in local_tags]
+
+        clusters = None
+        step1_terms = api_terms
+        if CLUSTER_CANDIDATES:
+            freq_map = dict(zip(df_candidates["term"].astype(str), df_candidates["freq"]))
+            clusters = cluster_terms(api_terms, freq_map)
+            step1_terms = list(clusters)
+            _report_clustering(api_terms, step1_terms, contexts_cache, existing_terms, clusters)
+
+        tag_map_step1 = dict(local_tags)
+        for i in tqdm(range(0, len(step1_terms), BATCH_P1), desc="AI Step 1: With Context"):
+            batch = step1_terms[i:i + BATCH_P1]
+            tags = classify_batch(batch, contexts_cache, existing_terms, clusters)
+            append_decisions([{**records[t], "tag": tags[t]} for t in batch if tags.get(t) in {"Keep", "Remove"}])
+            tag_map_step1.update(tags)
+
+        # Step 2 needs every Step 1 Keep in existing_terms, so it starts only
+        # once Step 1 is complete; each pruned batch's Keep rows stream out.
+        keep_terms = [t for t, tag in tag_map_step1.items() if tag == "Keep"]
+        final_tag_map = dict(tag_map_step1)
+        for i in tqdm(range(0, len(keep_terms), BATCH_P1), desc="AI Step 2: Prune Redundant"):
+            batch = keep_terms[i:i + BATCH_P1]
+            tags = prune_batch(batch, existing_terms)
+            final_tag_map.update(tags)
+            kept = [t for t in batch if tags.get(t) == "Keep"]
+            writer.write(df_candidates[df_candidates["term"].isin(kept)])
 
-    df_candidates["tag"] = df_candidates["term"].map(final_tag_map)
-    df_candidates = df_candidates[df_candidates["tag"] == "Keep"]
-    df_candidates = df_candidates[["term", "freq", "context"]]
+        df_candidates["tag"] = df_candidates["term"].map(lambda t: final_tag_map.get(t, "Need Recheck"))
+        df_candidates = df_candidates[df_candidates["tag"] == "Keep"]
+        df_candidates = df_candidates[OUTPUT_COLUMNS]
 
-    df_locked = df_locked[["term", "freq", "context"]]
+        df_locked = df_locked[OUTPUT_COLUMNS]
+
+        df_final = pd.concat([df_locked, df_candidates], ignore_index=True)
+        writer.finalize(df_final)
+        print(f"✅ Phase 3 done. Wrote {len(df_final)} rows.")
+        print(recovery_report())
+        print(request_report())
+        return df_final
+    finally:
+        writer.close()
+
+
+def _pre_classify(all_terms, records):
+    classifier = PreClassifier.load()
+    if classifier is None:
+        return {}
+    local_tags = {}
+    for t in all_terms:
+        tag = classifier.decide(records[t])
+        if tag is not None:
+            local_tags[t] = tag
+    calls_before = math.ceil(len(all_terms) / BATCH_P1)
+    calls_after = math.ceil((len(all_terms) - len(local_tags)) / BATCH_P1)
+    n_keep = sum(1 for tag in local_tags.values() if tag == "Keep")
+    print(
+        f"🧠 Pre-classifier tagged {len(local_tags)}/{len(all_terms)} candidates locally "
+        f"(Keep {n_keep}, Remove {len(local_tags) - n_keep}); "
+        f"Step 1 API calls avoided: {calls_before - calls_after}."
+    )
+    return local_tags
 
-    df_final = pd.concat([df_locked, df_candidates], ignore_index=True)
-    df_final.to_csv(OUTPUT_PHASE3, index=False, encoding="utf-8-sig")
-    print(f"✅ Phase 3 done. Wrote {len(df_final)} rows.")
-    return df_final
 
+def _report_clustering(all_terms, step1_terms, contexts_cache, existing_terms, clusters):
+    calls_before, chars_before = estimate_step1_cost(all_terms, contexts_cache, existing_terms)
+    calls_after, chars_after = estimate_step1_cost(step1_terms, contexts_cache, existing_terms, clusters)
+    saved = 1 - chars_after / chars_before if chars_before else 0.0
+    print(
+        f"🔗 Clustered {len(all_terms)} candidates into {len(step1_terms)} groups: "
+        f"API calls {calls_before} → {calls_after}, prompt chars {chars_before} → {chars_after} "
+        f"({saved:.0%} saved)."
+    )
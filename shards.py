@@ -0,0 +1,117 @@
+"""Shard-and-merge support for distributing Phase 1 across machines.
+
+``map`` turns one input shard into a partial-count artifact; ``merge``
+combines any number of artifacts (in any grouping) into one, from which the
+exact Phase 1 table of a single run over the shards concatenated in shard
+order can be rebuilt. Each artifact also carries the shard's token surface
+forms, so the Phase 2 capital-filter pushdown can be applied after the merge
+without re-reading any text.
+"""
+
+from __future__ import annotations
+
+import json
+
+PARTIAL_FORMAT = "glossary-phase1-partial"
+PARTIAL_VERSION = 2
+PARTIAL_SUFFIX = ".partial.json"
+
+
+def map_shard(input_file: str, shard: int) -> dict:
+    from .phase1 import count_terms, read_texts, token_forms, tokenize_rows
+
+    texts = read_texts(input_file)
+    segment_rows = tokenize_rows(texts)
+    return {
+        "format": PARTIAL_FORMAT,
+        "version": PARTIAL_VERSION,
+        "shards": {shard: len(texts)},
+        "texts": {shard: texts},
+        "forms": token_forms(segment_rows),
+        "terms": count_terms(texts, shard=shard, segment_rows=segment_rows),
+    }
+
+
+def _earlier(variant_a, pos_a, variant_b, pos_b):
+    if pos_a is None:
+        return variant_b, pos_b
+    if pos_b is None or pos_a <= pos_b:
+        return variant_a, pos_a
+    return variant_b, pos_b
+
+
+def merge_partials(a: dict, b: dict) -> dict:
+    overlap = set(a["shards"]) & set(b["shards"])
+    if overlap:
+        raise ValueError(f"Shard(s) {sorted(overlap)} appear in more than one partial.")
+
+    terms = {key: list(entry) for key, entry in a["terms"].items()}
+    for key, (freq, first_v, first_pos, title_v, title_pos) in b["terms"].items():
+        entry = terms.get(key)
+        if entry is None:
+            terms[key] = [freq, first_v, first_pos, title_v, title_pos]
+            continue
+        entry[0] += freq
+        entry[1], entry[2] = _earlier(entry[1], entry[2], first_v, first_pos)
+        entry[3], entry[4] = _earlier(entry[3], entry[4], title_v, title_pos)
+
+    forms = {low: set(variants) for low, variants in a["forms"].items()}
+    for low, variants in b["forms"].items():
+        forms.setdefault(low, set()).update(variants)
+
+    return {
+        "format": PARTIAL_FORMAT,
+        "version": PARTIAL_VERSION,
+        "shards": {**a["shards"], **b["shards"]},
+        "texts": {**a["texts"], **b["texts"]},
+        "forms": forms,
+        "terms": terms,
+    }
+
+
+def phase1_from_partial(partial: dict, pushdown: bool | None = None):
+    """Return ``(df_out, texts)`` exactly as ``run_phase1`` would produce them.
+
+    Shards are mapped without the Phase 2 pushdown, since the filter needs
+    corpus-wide knowledge; it is applied here, on the merged counts and
+    token forms.
+    """
+    from .config import PUSHDOWN_PHASE2_FILTERS
+    from .phase1 import build_phase1_table, passable_first_tokens
+
+    if pushdown is None:
+        pushdown = PUSHDOWN_PHASE2_FILTERS
+    offsets, texts = {}, []
+    for shard in sorted(partial["shards"]):
+        offsets[shard] = len(texts)
+        texts.extend(partial["texts"][shard])
+    first_tokens = passable_first_tokens(partial["forms"]) if pushdown else None
+    return build_phase1_table(partial["terms"], row_offsets=offsets, first_tokens=first_tokens), texts
+
+
+def save_partial(partial: dict, path: str) -> None:
+    payload = {
+        **partial,
+        "shards": {str(k): v for k, v in partial["shards"].items()},
+        "texts": {str(k): v for k, v in partial["texts"].items()},
+        "forms": {low: sorted(variants) for low, variants in partial["forms"].items()},
+    }
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh, ensure_ascii=False)
+
+
+def load_partial(path: str) -> dict:
+    with open(path, encoding="utf-8") as fh:
+        payload = json.load(fh)
+    if payload.get("format") != PARTIAL_FORMAT or payload.get("version") != PARTIAL_VERSION:
+        raise ValueError(f"{path} is not a Phase 1 partial (v{PARTIAL_VERSION}).")
+    return {
+        **payload,
+        "shards": {int(k): v for k, v in payload["shards"].items()},
+        "texts": {int(k): v for k, v in payload["texts"].items()},
+        "forms": {low: set(variants) for low, variants in payload["forms"].items()},
+        "terms": {
+            key: [freq, first_v, tuple(first_pos), title_v, tuple(title_pos) if title_pos else None]
+            for key, (freq, first_v, first_pos, title_v, title_pos) in payload["terms"].items()
+        },
+    }